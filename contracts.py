@@ -1,81 +1,95 @@
-import boto3
+import argparse
+import asyncio
+import functools
+import hashlib
 import json
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import AsyncExitStack
 from datetime import datetime
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.platypus import (Paragraph, SimpleDocTemplate, PageTemplate, Frame,
-                               Table, TableStyle, Spacer)
-from reportlab.platypus.tableofcontents import TableOfContents
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from io import BytesIO
-from textwrap import wrap
-from reportlab.platypus.doctemplate import PageBreak
-
-class StateContractGenerator:
-    def __init__(self, state_info):
-        self.state = state_info['state']
-        self.health_agency = state_info['health_agency']
-        self.agency_city = state_info['agency_city']
-        self.provider_name = state_info['provider_name']
-        self.provider_city = state_info['provider_city']
-        self.service_regions = state_info['service_regions']
-        self.contract_date = state_info['contract_date']
-        self.provider_details = state_info['provider_details']
-
-    def generate_content_with_bedrock(self, prompt):
-        bedrock_runtime = boto3.client(
-            service_name="bedrock-runtime",
-            region_name="us-east-1"
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+
+# boto/aioboto3, ReportLab and diskcache are imported where they are first used,
+# so the prompt builders and the PDF renderer each only pay for what they need
+
+MODEL_ID = "anthropic.claude-3-sonnet-20240229-v1:0"
+
+# Claude 3 Sonnet's output limit; raise it when switching to a model with a
+# larger output window so the combined four-section response fits
+MAX_OUTPUT_TOKENS = 4096
+
+# Bedrock models that accept cache_control checkpoints (matched with or without
+# a cross-region inference profile prefix such as "us.")
+PROMPT_CACHING_MODELS = {
+    "anthropic.claude-3-5-haiku-20241022-v1:0",
+    "anthropic.claude-3-7-sonnet-20250219-v1:0",
+    "anthropic.claude-sonnet-4-20250514-v1:0",
+    "anthropic.claude-opus-4-20250514-v1:0",
+}
+
+# Mark the stable instruction prefix of each prompt with cache_control so Bedrock
+# can reuse it across states. Only sent to models that support it, as others may
+# reject the field. The current prefixes (roughly 100-800 tokens) are below the
+# 1,024-token minimum a checkpoint needs, so nothing is cached until they grow.
+PROMPT_CACHING = any(MODEL_ID.endswith(model) for model in PROMPT_CACHING_MODELS)
+
+# On-disk cache of Bedrock responses, keyed by a hash of the model and request body
+RESPONSE_CACHE_DIR = "bedrock_cache"
+
+# Maximum number of states generated concurrently (each state issues 4 Bedrock calls)
+MAX_CONCURRENT_STATES = 4
+
+# Shared by every Bedrock call so connections stay pooled and throttling is
+# retried with client-side rate limiting
+BEDROCK_MAX_POOL_CONNECTIONS = 32
+BEDROCK_RETRIES = {"max_attempts": 8, "mode": "adaptive"}
+
+# Bedrock error codes (compared lowercased, as stream events spell them in
+# camelCase) that are worth retrying once botocore's own retries run out
+RETRYABLE_ERROR_CODES = {
+    "throttlingexception",
+    "servicequotaexceededexception",
+    "serviceunavailableexception",
+    "internalserverexception",
+    "modelnotreadyexception",
+    "modeltimeoutexception",
+    "modelstreamerrorexception",
+}
+
+# Attempts per contract section before the state is marked failed
+SECTION_ATTEMPTS = 3
+
+def create_bedrock_client(max_pool_connections=BEDROCK_MAX_POOL_CONNECTIONS):
+    """Open an async Bedrock runtime client; reuse one per event loop"""
+    import aioboto3
+    from botocore.config import Config
+
+    session = aioboto3.Session()
+    return session.client(
+        service_name="bedrock-runtime",
+        region_name="us-east-1",
+        config=Config(
+            max_pool_connections=max_pool_connections,
+            retries=BEDROCK_RETRIES
         )
+    )
 
-        body = json.dumps({
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 4096,
-            "messages": [{
-                "role": "user",
-                "content": prompt
-            }],
-            "temperature": 0.7
-        })
-
-        try:
-            response = bedrock_runtime.invoke_model(
-                modelId="anthropic.claude-3-sonnet-20240229-v1:0",
-                contentType="application/json",
-                body=body
-            )
-            
-            response_body = json.loads(response.get("body").read())
-            return response_body.get("content")[0].get("text")
-
-        except Exception as e:
-            print(f"Error generating content: {str(e)}")
-            return None
+# Prompt templates. The instructions hold no per-state data so they are byte-identical
+# across states (and cacheable by Bedrock); only the short details are filled in
+# with str.format from StateContractGenerator._fields.
+_SHARED_TAIL = """
+        Format the response as pipe-separated values for easy table creation."""
 
-    def create_contract(self):
-        prompt = f"""Generate a detailed contract between the {self.health_agency} (located in {self.agency_city}, {self.state}) 
-        and {self.provider_name} (a transportation provider headquartered in {self.provider_city}, {self.state}). 
+_CONTRACT_INSTRUCTIONS = """Generate a detailed contract between a state health agency and a medical
+        transportation provider, using the contract parties and details given below.
 
-        Use these specific details:
-        - Contract date: {self.contract_date}
-        - Term: {self.provider_details['term']}
-        - Service area: {', '.join(self.service_regions)}
-        - Provider details: 
-            * Fleet size: {self.provider_details['fleet_size']} vehicles
-            * Operating hours: {self.provider_details['operating_hours']}
-            * Number of certified drivers: {self.provider_details['driver_count']}
-        
         The response should be in a format that can be parsed into sections, with clear headings marked by '#' symbols.
-        Include standard contract sections but make all details specific to {self.state} and medical transportation."""
-
-        return self.generate_content_with_bedrock(prompt)
+        Include standard contract sections but make all details specific to the contract's state and medical transportation."""
 
-    def generate_rate_schedule(self):
-        prompt = f"""Generate a detailed transportation rate schedule for {self.health_agency} contract with {self.provider_name} 
-        in {self.state}. The response should be in a format that can be converted to a table with the following columns:
+_RATE_SCHEDULE_INSTRUCTIONS = """Generate a detailed transportation rate schedule for the agency contract with
+        the provider described below. The response should be in a format that can be converted to a table with the following columns:
         
         Service Type | Base Rate | Mileage Rate | Wait Time Rate | After Hours | Weekend/Holiday
         
@@ -86,19 +100,15 @@ class StateContractGenerator:
         - Bariatric Transport
         - Group Transport
         
-        Consider {self.state}'s:
+        Consider the state's:
         - Cost of living
         - Fuel costs
         - Urban vs rural rates
         - State regulations
         
-        Make rates realistic for {self.state} market in 2024.
-        Format the response as pipe-separated values for easy table creation."""
+        Make rates realistic for the state's market in 2024.""" + _SHARED_TAIL
 
-        return self.generate_content_with_bedrock(prompt)
-
-    def generate_service_areas(self):
-        prompt = f"""Generate a detailed service area coverage table for {self.provider_name}'s contract in {self.state}.
+_SERVICE_AREAS_INSTRUCTIONS = """Generate a detailed service area coverage table for the provider's contract in the state described below.
         The response should be in a format that can be converted to a table with the following columns:
 
         Service Zone | Counties Covered | Response Time | Population Served | Facilities Covered | Special Conditions
@@ -109,18 +119,14 @@ class StateContractGenerator:
         - Rural coverage
         - Special service areas
         
-        Consider {self.state}'s:
+        Consider the state's:
         - Geographic features
         - Population distribution
         - Healthcare facility locations
         - Emergency service requirements
+""" + _SHARED_TAIL
 
-        Format the response as pipe-separated values for easy table creation."""
-
-        return self.generate_content_with_bedrock(prompt)
-
-    def generate_performance_standards(self):
-        prompt = f"""Generate detailed performance standards for {self.provider_name}'s contract in {self.state}.
+_PERFORMANCE_STANDARDS_INSTRUCTIONS = """Generate detailed performance standards for the provider's contract in the state described below.
         The response should be in a format that can be converted to a table with the following columns:
 
         Performance Category | Standard | Measurement Method | Minimum Target | Penalty for Non-Compliance
@@ -133,53 +139,224 @@ class StateContractGenerator:
         - Safety metrics
         - Complaint resolution
         
-        Consider {self.state}'s:
+        Consider the state's:
         - Healthcare regulations
         - Quality metrics
         - Reporting requirements
+        """ + _SHARED_TAIL
+
+_CONTRACT_DETAILS = """Contract parties:
+        - Health agency: {health_agency} (located in {agency_city}, {state})
+        - Provider: {provider_name} (a transportation provider headquartered in {provider_city}, {state})
+
+        Use these specific details:
+        - Contract date: {contract_date}
+        - Term: {term}
+        - Service area: {service_regions}
+        - Provider details: 
+            * Fleet size: {fleet_size} vehicles
+            * Operating hours: {operating_hours}
+            * Number of certified drivers: {driver_count}
         
-        Format the response as pipe-separated values for easy table creation."""
+        Make all details specific to {state}."""
 
-        return self.generate_content_with_bedrock(prompt)
+_RATE_SCHEDULE_DETAILS = """Agency: {health_agency}
+        Provider: {provider_name}
+        State: {state}"""
 
-class ContractPDF:
-    def __init__(self, filename, title):
-        self.filename = filename
-        self.title = title
-        self.doc = SimpleDocTemplate(
-            filename,
-            pagesize=letter,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=72
+_PROVIDER_DETAILS = """Provider: {provider_name}
+        State: {state}"""
+
+# All four sections in one call, each introduced by its marker line. The
+# response must end with ===END===, so a truncated response can be detected
+COMBINED_SECTIONS = ("CONTRACT", "RATES", "AREAS", "PERF")
+
+_COMBINED_INSTRUCTIONS = """Generate all four parts of the contract described below in a single response.
+        Start each part with its marker line exactly as shown, in this order: ===CONTRACT===, ===RATES===, ===AREAS===, ===PERF===.
+        Follow the instructions given under each marker, and finish the response with a final ===END=== line.
+
+        ===CONTRACT===
+        """ + _CONTRACT_INSTRUCTIONS + """
+
+        ===RATES===
+        """ + _RATE_SCHEDULE_INSTRUCTIONS + """
+
+        ===AREAS===
+        """ + _SERVICE_AREAS_INSTRUCTIONS + """
+
+        ===PERF===
+        """ + _PERFORMANCE_STANDARDS_INSTRUCTIONS + """
+
+        ===END==="""
+
+_SECTION_RE = re.compile(r'^===(\w+)===[ \t]*\n?(.*?)(?=^===\w+===|\Z)', re.S | re.M)
+
+class StateContractGenerator:
+    def __init__(self, state_info, bedrock_runtime=None, response_cache=None):
+        self.bedrock_runtime = bedrock_runtime
+        self.response_cache = response_cache
+        self.state = state_info['state']
+        self.health_agency = state_info['health_agency']
+        self.agency_city = state_info['agency_city']
+        self.provider_name = state_info['provider_name']
+        self.provider_city = state_info['provider_city']
+        self.service_regions = state_info['service_regions']
+        self.contract_date = state_info['contract_date']
+        self.provider_details = state_info['provider_details']
+        self._fields = {
+            'state': self.state,
+            'health_agency': self.health_agency,
+            'agency_city': self.agency_city,
+            'provider_name': self.provider_name,
+            'provider_city': self.provider_city,
+            'service_regions': ', '.join(self.service_regions),
+            'contract_date': self.contract_date,
+            **self.provider_details
+        }
+
+    def _request_body(self, instructions, details):
+        """Serialize the Bedrock request for one prompt"""
+        instructions_block = {"type": "text", "text": instructions}
+        if PROMPT_CACHING:
+            instructions_block["cache_control"] = {"type": "ephemeral"}
+
+        return json.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": MAX_OUTPUT_TOKENS,
+            "messages": [{
+                "role": "user",
+                "content": [
+                    instructions_block,
+                    {"type": "text", "text": details}
+                ]
+            }],
+            "temperature": 0.7
+        })
+
+    async def stream_content_with_bedrock(self, instructions, details):
+        """Yield the generated text line by line as Bedrock streams it back"""
+        body = self._request_body(instructions, details)
+
+        async with AsyncExitStack() as stack:
+            bedrock_runtime = self.bedrock_runtime
+            if bedrock_runtime is None:
+                bedrock_runtime = await stack.enter_async_context(create_bedrock_client())
+
+            response = await bedrock_runtime.invoke_model_with_response_stream(
+                modelId=MODEL_ID,
+                contentType="application/json",
+                body=body
+            )
+
+            # Hold back the trailing partial line until its newline arrives
+            pending = StringIO()
+            async for event in response.get("body"):
+                chunk = json.loads(event["chunk"]["bytes"])
+                if chunk.get("type") != "content_block_delta":
+                    continue
+
+                text = chunk["delta"].get("text", "")
+                if "\n" not in text:
+                    pending.write(text)
+                    continue
+
+                *lines, tail = (pending.getvalue() + text).split("\n")
+                for line in lines:
+                    yield line
+                pending = StringIO()
+                pending.write(tail)
+
+            yield pending.getvalue()
+
+    async def generate_content_with_bedrock(self, instructions, details):
+        cache_key = None
+        if self.response_cache is not None:
+            # Key on the whole request, so changing max_tokens, temperature or
+            # prompt caching doesn't serve a response generated under the old settings
+            request = "\0".join((MODEL_ID, self._request_body(instructions, details)))
+            cache_key = hashlib.sha1(request.encode("utf-8")).hexdigest()
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        from botocore.exceptions import ClientError
+
+        try:
+            lines = [line async for line in self.stream_content_with_bedrock(instructions, details)]
+            content = "\n".join(lines)
+            if cache_key is not None:
+                self.response_cache.set(cache_key, content)
+            return content
+
+        except ClientError as e:
+            # Transient failures return None so the caller can retry this call;
+            # anything else (bad request, permissions) is a real error
+            if e.response.get("Error", {}).get("Code", "").lower() not in RETRYABLE_ERROR_CODES:
+                raise
+            print(f"Error generating content: {str(e)}")
+            return None
+
+    async def _call(self, instructions, details_template):
+        return await self.generate_content_with_bedrock(
+            instructions,
+            details_template.format(**self._fields)
         )
-        self.story = []
-        self.toc = TableOfContents()
-        self.toc.levelStyles = [
+
+    async def create_contract(self):
+        return await self._call(_CONTRACT_INSTRUCTIONS, _CONTRACT_DETAILS)
+
+    async def generate_rate_schedule(self):
+        return await self._call(_RATE_SCHEDULE_INSTRUCTIONS, _RATE_SCHEDULE_DETAILS)
+
+    async def generate_service_areas(self):
+        return await self._call(_SERVICE_AREAS_INSTRUCTIONS, _PROVIDER_DETAILS)
+
+    async def generate_performance_standards(self):
+        return await self._call(_PERFORMANCE_STANDARDS_INSTRUCTIONS, _PROVIDER_DETAILS)
+
+    async def generate_combined_sections(self):
+        """Generate all four sections in one call; returns {marker: text} for the complete ones"""
+        text = await self._call(_COMBINED_INSTRUCTIONS, _CONTRACT_DETAILS)
+        if not text:
+            return {}
+
+        sections = {name: body.strip() for name, body in _SECTION_RE.findall(text)}
+        if "END" not in sections:
+            # Truncated response: the last section present may be cut off
+            present = [name for name in COMBINED_SECTIONS if name in sections]
+            if present:
+                del sections[present[-1]]
+        return {name: sections[name] for name in COMBINED_SECTIONS if sections.get(name)}
+
+@functools.lru_cache(maxsize=None)
+def _pdf_styles():
+    """Build the ReportLab styles shared by every document, once per process"""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import TableStyle
+
+    sheet = getSampleStyleSheet()
+    return SimpleNamespace(
+        sheet=sheet,
+        headings=[sheet[f'Heading{level}'] for level in range(1, 7)],
+        title=ParagraphStyle(
+            'CustomTitle',
+            parent=sheet['Heading1'],
+            fontSize=16,
+            spaceAfter=30
+        ),
+        table_title=ParagraphStyle(
+            'TableTitle',
+            fontSize=12,
+            spaceAfter=10,
+            spaceBefore=20
+        ),
+        toc_levels=[
             ParagraphStyle(name='TOCHeading1', fontSize=12, leftIndent=20),
             ParagraphStyle(name='TOCHeading2', fontSize=10, leftIndent=40),
             ParagraphStyle(name='TOCHeading3', fontSize=10, leftIndent=60),
-        ]
-
-    def create_table_from_data(self, data, table_title):
-        """Convert pipe-separated data into a formatted table with flexible column widths"""
-        # Split data into rows
-        rows = [row.strip().split('|') for row in data.strip().split('\n')]
-        # Strip whitespace from each cell
-        rows = [[cell.strip() for cell in row] for row in rows]
-        
-        # Calculate column widths based on content
-        col_widths = []
-        for col_idx in range(len(rows[0])):
-            max_width = max(len(str(row[col_idx])) for row in rows)
-            col_widths.append(min(max_width * 0.1 * inch, self.doc.width/len(rows[0])))
-        
-        # Create the table
-        table = Table(rows, colWidths=col_widths, repeatRows=1)
-        
-        # Add style
-        style = TableStyle([
+        ],
+        table=TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -197,15 +374,82 @@ class ContractPDF:
             ('LEFTPADDING', (0, 0), (-1, -1), 3),
             ('RIGHTPADDING', (0, 0), (-1, -1), 3),
         ])
-        table.setStyle(style)
+    )
+
+# Fixed row heights for the attachment table style (12pt leading plus padding); cells are
+# single-line strings, so ReportLab doesn't need to measure every row
+_HEADER_ROW_HEIGHT = 27
+_BODY_ROW_HEIGHT = 18
+
+@functools.lru_cache(maxsize=128)
+def _layout_table(data, frame_width):
+    """Parse pipe-separated data into (rows, col_widths, row_heights) tuples"""
+    from reportlab.lib.units import inch
+
+    # Split data into rows of stripped cells, dropping the outer pipes of
+    # markdown-style rows and skipping blank lines
+    lines = [line.strip().strip('|') for line in data.splitlines()]
+    rows = tuple(tuple(cell.strip() for cell in line.split('|')) for line in lines if line)
+
+    # Calculate column widths from the longest cell in each column, capped
+    # at an equal share of the page width. Rows can be ragged (e.g. a one-line
+    # preamble before the table), so size by the widest row
+    ncols = max(len(row) for row in rows)
+    max_col_width = frame_width / ncols
+    col_widths_chars = [0] * ncols
+    for row in rows:
+        for col_idx, cell in enumerate(row):
+            if len(cell) > col_widths_chars[col_idx]:
+                col_widths_chars[col_idx] = len(cell)
+    col_widths = tuple(min(width * 0.1 * inch, max_col_width) for width in col_widths_chars)
+
+    row_heights = (_HEADER_ROW_HEIGHT,) + (_BODY_ROW_HEIGHT,) * (len(rows) - 1)
+    return rows, col_widths, row_heights
+
+class ContractPDF:
+    def __init__(self, filename, title):
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate
+        from reportlab.platypus.tableofcontents import TableOfContents
+
+        self.filename = filename
+        self.title = title
+        # Drawn on every page, so format the date once
+        self._generated_str = f"Generated: {datetime.now().strftime('%B %d, %Y')}"
+        # Build into memory and write the finished PDF to disk in one go
+        self._buffer = BytesIO()
+        self.doc = SimpleDocTemplate(
+            self._buffer,
+            pagesize=letter,
+            rightMargin=72,
+            leftMargin=72,
+            topMargin=72,
+            bottomMargin=72
+        )
+        self.styles = _pdf_styles()
+        self.story = []
+        self.toc = TableOfContents()
+        self.toc.levelStyles = self.styles.toc_levels
+
+    def create_table_from_data(self, data, table_title):
+        """Convert pipe-separated data into a formatted table with flexible column widths"""
+        from reportlab.platypus import Paragraph, Spacer, Table
+
+        # Parsing is memoized on the raw text so identical attachments are only
+        # measured once; the Table itself is mutated during layout, so it is
+        # rebuilt from the shared rows every time
+        rows, col_widths, row_heights = _layout_table(data, self.doc.width)
+
+        # Create the table
+        table = Table([list(row) for row in rows], colWidths=list(col_widths),
+                      rowHeights=list(row_heights), repeatRows=1)
+        
+        # Add style
+        table.setStyle(self.styles.table)
         
         # Add table title
         elements = []
-        elements.append(Paragraph(f"<b>{table_title}</b>", 
-                                ParagraphStyle('TableTitle', 
-                                             fontSize=12, 
-                                             spaceAfter=10,
-                                             spaceBefore=20)))
+        elements.append(Paragraph(f"<b>{table_title}</b>", self.styles.table_title))
         elements.append(table)
         elements.append(Spacer(1, 20))  # Add space after table
         
@@ -214,8 +458,8 @@ class ContractPDF:
     def header(self, canvas, doc):
         canvas.saveState()
         canvas.setFont('Helvetica-Bold', 10)
-        canvas.drawString(72, 800, f"{self.title}")
-        canvas.drawString(72, 785, f"Generated: {datetime.now().strftime('%B %d, %Y')}")
+        canvas.drawString(72, 800, self.title)
+        canvas.drawString(72, 785, self._generated_str)
         canvas.restoreState()
 
     def footer(self, canvas, doc):
@@ -231,35 +475,39 @@ class ContractPDF:
         self.footer(canvas, doc)
 
     def create_document(self, contract_content, rate_schedule, service_areas, performance_standards):
-        styles = getSampleStyleSheet()
-        
+        from reportlab.platypus import Frame, PageBreak, PageTemplate, Paragraph
+
         # Add title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30
-        )
-        self.story.append(Paragraph(self.title, title_style))
+        self.story.append(Paragraph(self.title, self.styles.title))
         self.story.append(PageBreak())
         
         # Add table of contents
-        self.story.append(Paragraph('Table of Contents', styles['Heading1']))
+        self.story.append(Paragraph('Table of Contents', self.styles.sheet['Heading1']))
         self.story.append(self.toc)
         self.story.append(PageBreak())
         
-        # Process main contract content
+        # Process main contract content; consecutive body lines become one paragraph
+        body_lines = []
+
+        def flush_body_lines():
+            if body_lines:
+                self.story.append(Paragraph('<br/>'.join(body_lines), self.styles.sheet['Normal']))
+                body_lines.clear()
+
         for section in contract_content.split('\n'):
-            if section.strip():
-                if section.startswith('#'):
-                    level = section.count('#')
-                    text = section.strip('#').strip()
-                    self.story.append(Paragraph(text, styles[f'Heading{level}']))
-                else:
-                    self.story.append(Paragraph(section, styles['Normal']))
+            if section.startswith('#'):
+                flush_body_lines()
+                level = section.count('#')
+                text = section.strip('#').strip()
+                self.story.append(Paragraph(text, self.styles.headings[level - 1]))
+            elif section.strip():
+                body_lines.append(section)
+            else:
+                flush_body_lines()
+        flush_body_lines()
         
         # Add attachments section
-        self.story.append(Paragraph('Attachments', styles['Heading1']))
+        self.story.append(Paragraph('Attachments', self.styles.sheet['Heading1']))
         
         # Add Rate Schedule
         self.story.extend(self.create_table_from_data(rate_schedule, 'Attachment A: Rate Schedule'))
@@ -287,52 +535,102 @@ class ContractPDF:
         
         # Build document
         self.doc.multiBuild(self.story)
+        with open(self.filename, 'wb') as f:
+            f.write(self._buffer.getvalue())
 
 def generate_filename(base_name, state_info):
     date_str = datetime.now().strftime("%Y%m%d")
     state_abbrev = state_info['state_abbrev']
     return f"{base_name}_{state_abbrev}_{date_str}.pdf"
 
-def process_state(state_info):
+async def generate_section(generate, content=None):
+    """Return content if the combined call produced it, otherwise run one
+    generator method, retrying it when Bedrock fails transiently"""
+    if content:
+        return content
+    for attempt in range(SECTION_ATTEMPTS):
+        content = await generate()
+        if content:
+            return content
+        if attempt + 1 < SECTION_ATTEMPTS:
+            await asyncio.sleep(2 ** attempt)
+    return None
+
+async def process_state(state_info, bedrock_runtime=None, response_cache=None):
     try:
         print(f"\nProcessing {state_info['state']}...")
         
         # Initialize generator
-        generator = StateContractGenerator(state_info)
-
-        # Generate all content
-        contract_text = generator.create_contract()
-        rate_schedule = generator.generate_rate_schedule()
-        service_areas = generator.generate_service_areas()
-        performance_standards = generator.generate_performance_standards()
+        generator = StateContractGenerator(state_info, bedrock_runtime, response_cache)
+
+        # Generate all content in one combined call; any section missing from it
+        # falls back to its own call, and those run concurrently with retries
+        sections = await generator.generate_combined_sections()
+        results = await asyncio.gather(
+            generate_section(generator.create_contract, sections.get("CONTRACT")),
+            generate_section(generator.generate_rate_schedule, sections.get("RATES")),
+            generate_section(generator.generate_service_areas, sections.get("AREAS")),
+            generate_section(generator.generate_performance_standards, sections.get("PERF")),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        contract_text, rate_schedule, service_areas, performance_standards = results
 
         if all([contract_text, rate_schedule, service_areas, performance_standards]):
             filename = generate_filename("Transportation_Contract", state_info)
-            pdf = ContractPDF(
+            return (
                 filename,
-                f"Transportation Services Contract - {state_info['state']}"
-            )
-            
-            pdf.create_document(
+                f"Transportation Services Contract - {state_info['state']}",
                 contract_text,
                 rate_schedule,
                 service_areas,
                 performance_standards
             )
-            
-            print(f"Successfully generated contract for {state_info['state']}")
-            print(f"Saved as: {filename}")
-            return True
         else:
             print(f"Error: Failed to generate some content for {state_info['state']}")
-            return False
+            return None
             
     except Exception as e:
         print(f"Error processing {state_info['state']}: {str(e)}")
-        return False
+        return None
+
+def render_contract_pdf(payload):
+    """Build one contract PDF from a process_state payload; runs in a worker process"""
+    filename, title, contract_text, rate_schedule, service_areas, performance_standards = payload
+    pdf = ContractPDF(filename, title)
+    pdf.create_document(
+        contract_text,
+        rate_schedule,
+        service_areas,
+        performance_standards
+    )
+    return filename
+
+async def process_states(state_configs, response_cache=None):
+    # Limit the number of states in flight so we stay within Bedrock TPS quotas
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_STATES)
+
+    # Each state issues 4 concurrent calls, so size the pool to avoid contention
+    max_pool_connections = max(BEDROCK_MAX_POOL_CONNECTIONS, len(state_configs) * 4)
+    async with create_bedrock_client(max_pool_connections) as bedrock_runtime:
+        async def bounded_process_state(state_info):
+            async with semaphore:
+                return await process_state(state_info, bedrock_runtime, response_cache)
+
+        return await asyncio.gather(
+            *(bounded_process_state(state_info) for state_info in state_configs.values())
+        )
 
 def main():
-
+    parser = argparse.ArgumentParser(description="Generate state transportation contracts")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="ignore the local Bedrock response cache and regenerate all content"
+    )
+    args = parser.parse_args()
 
     state_configs = {
         "FL": {
@@ -545,6 +843,13 @@ def main():
         }
     }
     
+    # Open the response cache before changing into the output directory
+    response_cache = None
+    if not args.no_cache:
+        from diskcache import Cache
+
+        response_cache = Cache(os.path.abspath(RESPONSE_CACHE_DIR))
+
     # Create output directory if it doesn't exist
     output_dir = "contracts"
     os.makedirs(output_dir, exist_ok=True)
@@ -554,11 +859,33 @@ def main():
     successful_states = 0
     failed_states = []
 
-    for state_code, state_info in state_configs.items():
-        if process_state(state_info):
+    try:
+        results = asyncio.run(process_states(state_configs, response_cache))
+    finally:
+        if response_cache is not None:
+            response_cache.close()
+
+    # Render the PDFs in parallel; ReportLab layout is CPU-bound
+    with ProcessPoolExecutor() as pool:
+        futures = {}
+        for state_code, payload in zip(state_configs, results):
+            if payload is None:
+                failed_states.append(state_code)
+            else:
+                futures[state_code] = pool.submit(render_contract_pdf, payload)
+
+        for state_code, future in futures.items():
+            state_name = state_configs[state_code]['state']
+            try:
+                filename = future.result()
+            except Exception as e:
+                print(f"Error processing {state_name}: {str(e)}")
+                failed_states.append(state_code)
+                continue
+
+            print(f"Successfully generated contract for {state_name}")
+            print(f"Saved as: {filename}")
             successful_states += 1
-        else:
-            failed_states.append(state_code)
 
     # Print summary
     print("\nGeneration Summary:")
@@ -1,11 +1,31 @@
-import boto3
+import contextlib
+import functools
+import hashlib
 import json
+import logging
+import logging.handlers
 import os
+import re
 from datetime import datetime
-import pdfkit
-from jinja2 import Template
-import webbrowser
+import queue
+import subprocess
 import sys
+import tempfile
+import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# boto3, pdfkit, jinja2 and pypdf are imported where they are first used, so
+# importing this module doesn't pay for the Bedrock client or the PDF stack
+
+# orjson encodes straight to bytes and is much faster; stdlib json works too
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
 
 # Configure path for wkhtmltopdf based on operating system
 if sys.platform.startswith('win'):
@@ -18,12 +38,121 @@ else:
     # Linux path
     WKHTMLTOPDF_PATH = '/usr/bin/wkhtmltopdf'
 
-# Configure pdfkit with the path
-try:
-    config = pdfkit.configuration(wkhtmltopdf=WKHTMLTOPDF_PATH)
-except Exception as e:
-    print(f"Error configuring pdfkit: {str(e)}")
-    config = None
+@functools.lru_cache(maxsize=None)
+def pdfkit_config():
+    """Configure pdfkit once for every state; if the platform path is missing,
+    fall back to whichever wkhtmltopdf is on the PATH, and raise if there is none"""
+    import pdfkit
+
+    try:
+        return pdfkit.configuration(wkhtmltopdf=WKHTMLTOPDF_PATH)
+    except OSError:
+        return pdfkit.configuration()
+
+
+# Number of states processed in parallel; the work is dominated by
+# Bedrock round-trips and wkhtmltopdf subprocesses, so threads overlap well
+MAX_STATE_WORKERS = 16
+
+# Also write each contract's intermediate HTML next to its PDF (SAVE_HTML=1)
+SAVE_HTML = os.environ.get('SAVE_HTML') == '1'
+
+#MODEL_ID = "anthropic.claude-3-5-sonnet-20240620-v1:0"
+MODEL_ID = "anthropic.claude-3-sonnet-20240229-v1:0"
+
+# Bedrock responses are cached on disk by a hash of the model and prompt, so
+# re-runs with unchanged prompts skip the call; BEDROCK_CACHE=0 bypasses it
+BEDROCK_CACHE = os.environ.get('BEDROCK_CACHE') != '0'
+BEDROCK_CACHE_DIR = os.path.abspath(".bedrock_cache")
+
+# Contracts rendered per wkhtmltopdf run; the combined PDF is split back per state
+PDF_BATCH_SIZE = 5
+
+# Persistent wkhtmltopdf processes (--read-args-from-stdin); one per concurrent
+# batch, so batches render in parallel without paying a process start each
+PDF_WORKERS = 3
+
+# wkhtmltopdf options shared by every render. [title] and [sitepage] are taken
+# per page object, so headers and page numbers stay per state within a batch
+PDF_OPTIONS = {
+    'page-size': 'Letter',
+    'margin-top': '25mm',
+    'margin-right': '25mm',
+    'margin-bottom': '25mm',
+    'margin-left': '25mm',
+    'encoding': 'UTF-8',
+    'enable-local-file-access': '',
+    'footer-right': '[sitepage] of [sitepages]',
+    'footer-font-size': '9',
+    'header-font-size': '9',
+    'header-left': '[title]',
+    'header-right': datetime.now().strftime('%B %d, %Y'),
+    'header-line': '',
+    'footer-line': '',
+    'footer-left': 'Confidential and Proprietary',
+    'quiet': ''
+}
+
+# Batches also need an outline to find where each state's contract starts
+BATCH_PDF_OPTIONS = {**PDF_OPTIONS, 'outline': '', 'outline-depth': '1'}
+
+# Per-state progress is logged at INFO; LOG_LEVEL=WARNING keeps only problems
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+
+logger = logging.getLogger(__name__)
+
+
+@contextlib.contextmanager
+def logging_to_console():
+    """Send log records from every thread through a queue to one background
+    writer, so the state threads never block on the console. Queued records
+    are flushed and the root logger restored on exit; an application's own
+    logging setup is left alone."""
+    root = logging.getLogger()
+    if root.handlers:
+        yield
+        return
+
+    # An unrecognized LOG_LEVEL falls back to INFO rather than aborting the run
+    level = logging.getLevelName(LOG_LEVEL)
+    if not isinstance(level, int):
+        level = None
+    previous_level = root.level
+    root.setLevel(logging.INFO if level is None else level)
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s %(threadName)s %(message)s'))
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    root.addHandler(queue_handler)
+    listener.start()
+    try:
+        if level is None:
+            logger.warning(f"Unknown LOG_LEVEL {LOG_LEVEL!r}, using INFO")
+        yield
+    finally:
+        listener.stop()
+        root.removeHandler(queue_handler)
+        root.setLevel(previous_level)
+
+
+@functools.lru_cache(maxsize=None)
+def bedrock_client():
+    """One client shared by every thread: boto3 clients are thread-safe, and reusing
+    it keeps TLS connections to Bedrock warm. The pool is sized for 4 concurrent
+    calls per state across all state workers."""
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client(
+        service_name="bedrock-runtime",
+        region_name="us-east-1",
+        config=Config(
+            retries={'max_attempts': 5, 'mode': 'adaptive'},
+            max_pool_connections=MAX_STATE_WORKERS * 4
+        )
+    )
 
 
 # State configurations dictionary
@@ -238,6 +367,9 @@ state_configs = {
     }
 }
 
+# (state_code, state_info) pairs in configuration order, built once for main()
+_STATE_ITEMS = tuple(state_configs.items())
+
 
 class StateContractGenerator:
     def __init__(self, state_info):
@@ -251,12 +383,15 @@ class StateContractGenerator:
         self.provider_details = state_info['provider_details']
 
     def generate_content_with_bedrock(self, prompt):
-        bedrock_runtime = boto3.client(
-            service_name="bedrock-runtime",
-            region_name="us-east-1"
-        )
+        cache_path = None
+        if BEDROCK_CACHE:
+            key = hashlib.sha256(f"{MODEL_ID}\0{prompt}".encode('utf-8')).hexdigest()
+            cache_path = os.path.join(BEDROCK_CACHE_DIR, f"{key}.txt")
+            if os.path.exists(cache_path):
+                with open(cache_path, encoding='utf-8') as f:
+                    return f.read()
 
-        body = json.dumps({
+        body = _json_dumps({
             "anthropic_version": "bedrock-2023-05-31",
             "max_tokens": 4096,
             "messages": [{
@@ -267,20 +402,34 @@ class StateContractGenerator:
         })
 
         try:
-            response = bedrock_runtime.invoke_model(
-                #modelId="anthropic.claude-3-5-sonnet-20240620-v1:0",
-                modelId="anthropic.claude-3-sonnet-20240229-v1:0",
+            response = bedrock_client().invoke_model(
+                modelId=MODEL_ID,
                 contentType="application/json",
                 body=body
             )
             
-            response_body = json.loads(response.get("body").read())
-            return response_body.get("content")[0].get("text")
+            response_body = _json_loads(response["body"].read())
+            content = response_body.get("content")[0].get("text")
 
         except Exception as e:
-            print(f"Error generating content: {str(e)}")
+            logger.error(f"Error generating content: {str(e)}")
             return None
 
+        if cache_path is not None:
+            # Write under a unique name and rename, so a state running the
+            # same prompt concurrently never reads a partial entry. A cache
+            # that can't be written only costs the next run a Bedrock call.
+            tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            try:
+                os.makedirs(BEDROCK_CACHE_DIR, exist_ok=True)
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                logger.warning(f"Could not cache Bedrock response: {str(e)}")
+
+        return content
+
     def create_contract(self):
         prompt = f"""Create a detailed transportation services contract between {self.health_agency} and {self.provider_name}.
         Format the response as HTML with proper sections and headings.
@@ -380,16 +529,19 @@ class StateContractGenerator:
 
         return self.generate_content_with_bedrock(prompt)
 
-class ContractHTML:
-    def __init__(self, title):
-        self.title = title
-        self.html_template = """
+# Compiled once at import and shared by every document
+_HTML_TEMPLATE_SRC = """
         <!DOCTYPE html>
         <html lang="en">
         <head>
             <meta charset="UTF-8">
             <title>{{ title }}</title>
             <style>
+                {% if for_pdf %}
+                * {
+                    text-rendering: optimizeSpeed;
+                }
+                {% endif %}
                 body {
                     font-family: Arial, sans-serif;
                     line-height: 1.6;
@@ -433,7 +585,11 @@ class ContractHTML:
                     border-collapse: collapse;
                     margin: 20px 0;
                     background-color: #fff;
+                    {% if for_pdf %}
+                    border: 1px solid #eee;
+                    {% else %}
                     box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+                    {% endif %}
                 }
                 th {
                     background-color: #34495e;
@@ -459,8 +615,12 @@ class ContractHTML:
                     margin: 30px 0;
                     padding: 20px;
                     background-color: #fff;
+                    {% if for_pdf %}
+                    border: 1px solid #eee;
+                    {% else %}
                     border-radius: 5px;
                     box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+                    {% endif %}
                 }
                 .footer {
                     margin-top: 50px;
@@ -538,29 +698,60 @@ class ContractHTML:
         </html>
         """
 
-    def create_document(self, contract_content, rate_schedule, service_areas, performance_standards):
-        # Process contract content to convert markdown-style headers to HTML
-        processed_content = []
-        for line in contract_content.split('\n'):
-            if line.strip():
-                if line.startswith('#'):
-                    level = line.count('#')
-                    text = line.strip('#').strip()
-                    processed_content.append(f"<h{level}>{text}</h{level}>")
-                else:
-                    processed_content.append(f"<p>{line}</p>")
-        
-        contract_html = '\n'.join(processed_content)
+# Dedent the template and collapse its stylesheet once at import, so every
+# render emits (and wkhtmltopdf parses) as little whitespace as possible
+_STYLE_RE = re.compile(r'(<style>)(.*?)(</style>)', re.S)
+_CSS_SPACE_RE = re.compile(r'\s+')
+_CSS_PUNCT_RE = re.compile(r'\s*([{};:,])\s*')
+
+def _minify_css(match):
+    css = _CSS_PUNCT_RE.sub(r'\1', _CSS_SPACE_RE.sub(' ', match.group(2)))
+    return f"{match.group(1)}{css.strip()}{match.group(3)}"
+
+_HTML_TEMPLATE_SRC = _STYLE_RE.sub(_minify_css, textwrap.dedent(_HTML_TEMPLATE_SRC).strip())
+
+@functools.lru_cache(maxsize=None)
+def html_template():
+    """The contract template, compiled on first use and reused for every state"""
+    from jinja2 import Environment
+
+    return Environment(autoescape=False).from_string(_HTML_TEMPLATE_SRC)
+
+# Markdown-style contract text to HTML, applied as whole-text regex passes:
+# blank lines are dropped, then each remaining line becomes a heading if it
+# starts with '#' or a paragraph otherwise (HTML the model wrote included)
+_BLANK_LINE_RE = re.compile(r'^[ \t]*(?:\n|\Z)', re.M)
+_LINE_RE = re.compile(r'^(?:(#{1,6})[ \t]*(.*?)[ \t#]*|(.+))$', re.M)
+
+def _render_line(match):
+    if match.group(1):
+        level = len(match.group(1))
+        return f"<h{level}>{match.group(2)}</h{level}>"
+    return f"<p>{match.group(3)}</p>"
+
+
+class ContractHTML:
+    def __init__(self, title):
+        self.title = title
+
+    def create_document(self, contract_content, rate_schedule, service_areas, performance_standards, for_pdf=True):
+        # for_pdf swaps shadows and rounded corners, which are slow to paint in
+        # wkhtmltopdf, for plain borders; pass False for an on-screen preview
+        # Process contract content to convert markdown-style headers to HTML:
+        # normalize CRLF, drop blank lines, turn '#' lines into headings and
+        # wrap the rest in <p>
+        contract_html = _BLANK_LINE_RE.sub('', contract_content.replace('\r\n', '\n'))
+        contract_html = _LINE_RE.sub(_render_line, contract_html).strip()
 
         # Render template
-        template = Template(self.html_template)
-        html_content = template.render(
+        html_content = html_template().render(
             title=self.title,
             date=datetime.now().strftime('%B %d, %Y'),
             contract_content=contract_html,
             rate_schedule=rate_schedule,
             service_areas=service_areas,
-            performance_standards=performance_standards
+            performance_standards=performance_standards,
+            for_pdf=for_pdf
         )
         
         return html_content
@@ -570,32 +761,44 @@ def generate_filename(base_name, state_info):
     state_abbrev = state_info['state_abbrev']
     return f"{base_name}_{state_abbrev}_{date_str}"
 
+def write_html(filename, html_content):
+    """Write HTML as one buffered UTF-8 write, then publish it with an atomic rename"""
+    tmp_filename = f"{filename}.tmp"
+    with open(tmp_filename, 'wb', buffering=1024 * 1024) as f:
+        f.write(html_content.encode('utf-8'))
+    os.replace(tmp_filename, filename)
+
 def process_state(state_info):
+    """Generate a state's contract HTML; returns (pdf_filename, title, html_content) or None.
+
+    The PDF itself is rendered later, together with other states, by render_pdf_batch().
+    """
     try:
-        print(f"\nProcessing {state_info['state']}...")
+        logger.info(f"Processing {state_info['state']}...")
         
         # Initialize generator
         generator = StateContractGenerator(state_info)
 
-        # Generate all content
-        print(f"Generating contract content for {state_info['state']}...")
-        contract_text = generator.create_contract()
-        
-        print(f"Generating rate schedule for {state_info['state']}...")
-        rate_schedule = generator.generate_rate_schedule()
-        
-        print(f"Generating service areas for {state_info['state']}...")
-        service_areas = generator.generate_service_areas()
-        
-        print(f"Generating performance standards for {state_info['state']}...")
-        performance_standards = generator.generate_performance_standards()
+        # Generate all content; the four Bedrock calls are independent, so run them concurrently
+        logger.info(f"Generating contract content, rate schedule, service areas and performance standards for {state_info['state']}...")
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix=f"bedrock-{state_info['state_abbrev']}") as executor:
+            contract_future = executor.submit(generator.create_contract)
+            rate_schedule_future = executor.submit(generator.generate_rate_schedule)
+            service_areas_future = executor.submit(generator.generate_service_areas)
+            performance_standards_future = executor.submit(generator.generate_performance_standards)
+
+        contract_text = contract_future.result()
+        rate_schedule = rate_schedule_future.result()
+        service_areas = service_areas_future.result()
+        performance_standards = performance_standards_future.result()
 
         if all([contract_text, rate_schedule, service_areas, performance_standards]):
             base_filename = generate_filename("Transportation_Contract", state_info)
             
             # Create HTML document
-            print(f"Creating HTML document for {state_info['state']}...")
-            html = ContractHTML(f"Transportation Services Contract - {state_info['state']}")
+            logger.info(f"Creating HTML document for {state_info['state']}...")
+            title = f"Transportation Services Contract - {state_info['state']}"
+            html = ContractHTML(title)
             html_content = html.create_document(
                 contract_text,
                 rate_schedule,
@@ -603,92 +806,205 @@ def process_state(state_info):
                 performance_standards
             )
             
-            # Save HTML file
-            html_filename = f"{base_filename}.html"
-            with open(html_filename, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"HTML file saved: {html_filename}")
-
-            # Convert to PDF
-            print(f"Converting to PDF for {state_info['state']}...")
-            pdf_filename = f"{base_filename}.pdf"
-            
-            try:
-                # First, try to find wkhtmltopdf in the system path
-                config = pdfkit.configuration()
-                
-                options = {
-                    'page-size': 'Letter',
-                    'margin-top': '25mm',
-                    'margin-right': '25mm',
-                    'margin-bottom': '25mm',
-                    'margin-left': '25mm',
-                    'encoding': 'UTF-8',
-                    'enable-local-file-access': '',
-                    'footer-right': '[page] of [topage]',
-                    'footer-font-size': '9',
-                    'header-font-size': '9',
-                    'header-left': f"Transportation Services Contract - {state_info['state']}",
-                    'header-right': datetime.now().strftime('%B %d, %Y'),
-                    'header-line': '',
-                    'footer-line': '',
-                    'footer-left': 'Confidential and Proprietary',
-                    'quiet': ''
-                }
+            # Save the screen variant of the HTML (only for debugging; the PDF is rendered from memory)
+            if SAVE_HTML:
+                html_filename = f"{base_filename}.html"
+                write_html(html_filename, html.create_document(
+                    contract_text,
+                    rate_schedule,
+                    service_areas,
+                    performance_standards,
+                    for_pdf=False
+                ))
+                logger.info(f"HTML file saved: {html_filename}")
 
-                # Try different methods of PDF generation
-                try:
-                    # Method 1: Direct from file
-                    pdfkit.from_file(html_filename, pdf_filename, options=options, configuration=config)
-                except Exception as e1:
-                    print(f"First method failed, trying alternative method: {str(e1)}")
-                    try:
-                        # Method 2: From string
-                        pdfkit.from_string(html_content, pdf_filename, options=options, configuration=config)
-                    except Exception as e2:
-                        print(f"Second method failed, trying final method: {str(e2)}")
-                        try:
-                            # Method 3: Simplified options
-                            simple_options = {
-                                'page-size': 'Letter',
-                                'encoding': 'UTF-8',
-                                'enable-local-file-access': '',
-                                'quiet': ''
-                            }
-                            pdfkit.from_file(html_filename, pdf_filename, options=simple_options, configuration=config)
-                        except Exception as e3:
-                            raise Exception(f"All PDF generation methods failed: {str(e3)}")
-
-                print(f"PDF file saved: {pdf_filename}")
-                
-            except Exception as e:
-                print(f"Error converting to PDF: {str(e)}")
-                print("Checking wkhtmltopdf installation...")
-                
-                # Try to get wkhtmltopdf version
-                try:
-                    import subprocess
-                    result = subprocess.run(['wkhtmltopdf', '-V'], capture_output=True, text=True)
-                    print(f"wkhtmltopdf version: {result.stdout}")
-                except Exception as ve:
-                    print("wkhtmltopdf not found in system path")
-                    print("Please ensure wkhtmltopdf is installed:")
-                    print("- Windows: Download from https://wkhtmltopdf.org/downloads.html")
-                    print("- Mac: brew install wkhtmltopdf")
-                    print("- Linux: sudo apt-get install wkhtmltopdf")
-                
-                return False
-            
-            print(f"Successfully generated contract for {state_info['state']}")
-            return True
+            return f"{base_filename}.pdf", title, html_content
         else:
-            print(f"Error: Failed to generate some content for {state_info['state']}")
-            return False
+            logger.error(f"Error: Failed to generate some content for {state_info['state']}")
+            return None
             
     except Exception as e:
-        print(f"Error processing {state_info['state']}: {str(e)}")
+        logger.error(f"Error processing {state_info['state']}: {str(e)}")
+        return None
+
+def convert_to_pdf(html_content, pdf_filename):
+    """Render one contract on its own wkhtmltopdf run; returns True on success"""
+    import pdfkit
+
+    logger.info(f"Converting to PDF: {pdf_filename}...")
+    try:
+        # Render straight from the in-memory HTML
+        pdfkit.from_string(html_content, pdf_filename, options=PDF_OPTIONS, configuration=pdfkit_config())
+        logger.info(f"PDF file saved: {pdf_filename}")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error converting to PDF: {str(e)}")
+        logger.info("Checking wkhtmltopdf installation...")
+        
+        # Try to get wkhtmltopdf version
+        try:
+            result = subprocess.run(['wkhtmltopdf', '-V'], capture_output=True, text=True)
+            logger.info(f"wkhtmltopdf version: {result.stdout}")
+        except Exception:
+            logger.error("wkhtmltopdf not found in system path")
+            logger.error("Please ensure wkhtmltopdf is installed:")
+            logger.error("- Windows: Download from https://wkhtmltopdf.org/downloads.html")
+            logger.error("- Mac: brew install wkhtmltopdf")
+            logger.error("- Linux: sudo apt-get install wkhtmltopdf")
+        
+        return False
+
+def wkhtmltopdf_arg_line(options, inputs, output):
+    """Build one --read-args-from-stdin job line: every argument double-quoted,
+    with backslashes and quotes escaped, and empty option values sent as bare flags"""
+    args = []
+    for key, value in options.items():
+        if key == 'quiet':
+            continue  # the "Done" progress line is how a finished job is detected
+        args.append(f'--{key}')
+        if value:
+            args.append(value)
+    args.extend(inputs)
+    args.append(output)
+    return ' '.join('"' + arg.replace('\\', '\\\\').replace('"', '\\"') + '"' for arg in args)
+
+class WkhtmltopdfWorker:
+    """A long-lived wkhtmltopdf process that runs one conversion per argument line on stdin"""
+
+    def __init__(self):
+        self.process = None
+
+    def convert(self, options, inputs, output):
+        """Render inputs into output; returns True once wkhtmltopdf reports the job done"""
+        line = wkhtmltopdf_arg_line(options, inputs, output)
+
+        try:
+            if self.process is None or self.process.poll() is not None:
+                binary = os.fsdecode(pdfkit_config().wkhtmltopdf)
+                self.process = subprocess.Popen(
+                    [binary, '--read-args-from-stdin'],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    encoding='utf-8',
+                    errors='replace'
+                )
+            self.process.stdin.write(line + '\n')
+            self.process.stdin.flush()
+            for message in self.process.stderr:
+                message = message.strip()
+                if message == 'Done':
+                    return True
+                if message.startswith(('Error', 'Exit with code')):
+                    logger.warning(f"wkhtmltopdf: {message}")
+        except OSError as e:
+            logger.warning(f"wkhtmltopdf worker failed: {str(e)}")
+
+        # wkhtmltopdf exits when a job fails; the next job starts a fresh process
+        self.close()
         return False
 
+    def close(self):
+        if self.process is not None:
+            if self.process.poll() is None:
+                try:
+                    self.process.stdin.close()
+                    self.process.wait(timeout=10)
+                except (OSError, subprocess.TimeoutExpired):
+                    self.process.kill()
+            self.process = None
+
+# Idle workers; a batch checks one out for the duration of its conversion
+_PDF_WORKERS = [WkhtmltopdfWorker() for _ in range(PDF_WORKERS)]
+_IDLE_PDF_WORKERS = queue.Queue()
+for _worker in _PDF_WORKERS:
+    _IDLE_PDF_WORKERS.put(_worker)
+
+def find_document_starts(reader, titles):
+    """Return the first page index of each titled document in a combined PDF, or None"""
+    starts = {}
+
+    def walk(outline):
+        for item in outline:
+            if isinstance(item, list):
+                walk(item)
+            elif item.title.strip() in titles and item.title.strip() not in starts:
+                starts[item.title.strip()] = reader.get_destination_page_number(item)
+
+    walk(reader.outline)
+
+    if len(starts) < len(titles):
+        # No usable outline (e.g. an unpatched-Qt wkhtmltopdf build): each
+        # document's title first appears on its own first page
+        starts = {}
+        remaining = iter(titles)
+        current = next(remaining)
+        for page_index, page in enumerate(reader.pages):
+            if current in (page.extract_text() or ''):
+                starts[current] = page_index
+                current = next(remaining, None)
+                if current is None:
+                    break
+
+    if len(starts) < len(titles):
+        return None
+    pages = [starts[title] for title in titles]
+    if pages[0] != 0 or any(a >= b for a, b in zip(pages, pages[1:])):
+        return None
+    return pages
+
+def render_pdf_batch(batch):
+    """Render several contracts in one wkhtmltopdf run and split the result per state.
+
+    batch is a list of (state_code, (pdf_filename, title, html_content)); returns
+    {state_code: success}. Falls back to one run per state if the batch can't be split.
+    """
+    from pypdf import PdfReader, PdfWriter
+
+    logger.info(f"Converting to PDF for {', '.join(state_code for state_code, _ in batch)}...")
+    titles = [title for _, (_, title, _) in batch]
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Each input file becomes its own wkhtmltopdf page object, so every
+            # contract starts on a fresh page
+            html_files = []
+            for i, (_, (_, _, html_content)) in enumerate(batch):
+                html_file = os.path.join(tmp_dir, f"{i}.html")
+                write_html(html_file, html_content)
+                html_files.append(html_file)
+
+            combined_pdf = os.path.join(tmp_dir, "combined.pdf")
+            worker = _IDLE_PDF_WORKERS.get()
+            try:
+                rendered = worker.convert(BATCH_PDF_OPTIONS, html_files, combined_pdf)
+            finally:
+                _IDLE_PDF_WORKERS.put(worker)
+            if not rendered:
+                raise RuntimeError("wkhtmltopdf worker did not render the batch")
+
+            reader = PdfReader(combined_pdf)
+            starts = find_document_starts(reader, titles)
+            if starts is None:
+                raise ValueError("could not locate each contract in the combined PDF")
+
+            for (_, (pdf_filename, _, _)), start, end in zip(batch, starts, starts[1:] + [len(reader.pages)]):
+                writer = PdfWriter()
+                for page_index in range(start, end):
+                    writer.add_page(reader.pages[page_index])
+                with open(pdf_filename, 'wb') as f:
+                    writer.write(f)
+                logger.info(f"PDF file saved: {pdf_filename}")
+
+        return {state_code: True for state_code, _ in batch}
+
+    except Exception as e:
+        logger.warning(f"Batch PDF generation failed, converting states individually: {str(e)}")
+        return {
+            state_code: convert_to_pdf(html_content, pdf_filename)
+            for state_code, (pdf_filename, _, html_content) in batch
+        }
 
 
 def main():
@@ -699,25 +1015,58 @@ def main():
 
     print("Starting contract generation process...")
     print(f"Output directory: {os.path.abspath(output_dir)}")
-    print(f"Total states to process: {len(state_configs)}")
+    print(f"Total states to process: {len(_STATE_ITEMS)}")
     print("-" * 50)
 
-    # Process all states
+    # Process all states in parallel
     successful_states = 0
     failed_states = []
-    total_states = len(state_configs)
+    total_states = len(_STATE_ITEMS)
 
-    for i, (state_code, state_info) in enumerate(state_configs.items(), 1):
-        print(f"\nProcessing state {i} of {total_states}: {state_code}")
-        print("-" * 30)
-        
-        if process_state(state_info):
-            successful_states += 1
-        else:
-            failed_states.append(state_code)
-        
-        print(f"Completed {i} of {total_states} states")
-        print("-" * 30)
+    # Fail before any Bedrock calls if wkhtmltopdf can't be found
+    pdfkit_config()
+
+    # Build the shared Bedrock client up front so the state threads don't race to create it
+    bedrock_client()
+
+    with logging_to_console(), ThreadPoolExecutor(max_workers=min(MAX_STATE_WORKERS, total_states), thread_name_prefix="state") as executor:
+        futures = {
+            executor.submit(process_state, state_info): state_code
+            for state_code, state_info in _STATE_ITEMS
+        }
+
+        # Hand finished contracts to wkhtmltopdf PDF_BATCH_SIZE at a time
+        pending = []
+        batch_futures = []
+        for i, future in enumerate(as_completed(futures), 1):
+            state_code = futures[future]
+            result = future.result()
+            if result:
+                pending.append((state_code, result))
+                if len(pending) == PDF_BATCH_SIZE:
+                    batch_futures.append(executor.submit(render_pdf_batch, pending))
+                    pending = []
+            else:
+                failed_states.append(state_code)
+
+            logger.info(f"Completed {i} of {total_states} states ({state_code})")
+
+        if pending:
+            batch_futures.append(executor.submit(render_pdf_batch, pending))
+
+        for batch_future in batch_futures:
+            for state_code, success in batch_future.result().items():
+                if success:
+                    successful_states += 1
+                    logger.info(f"Successfully generated contract for {state_configs[state_code]['state']}")
+                else:
+                    failed_states.append(state_code)
+
+    for worker in _PDF_WORKERS:
+        worker.close()
+
+    # Report failures in configuration order rather than completion order
+    failed_states = [state_code for state_code, _ in _STATE_ITEMS if state_code in failed_states]
 
     # Print summary
     print("\n" + "=" * 50)
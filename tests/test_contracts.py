@@ -0,0 +1,174 @@
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import contracts
+
+STATE_INFO = {
+    "state": "Florida",
+    "state_abbrev": "FL",
+    "health_agency": "Florida Department of Health",
+    "agency_city": "Tallahassee",
+    "provider_name": "Sunshine Medical Transport",
+    "provider_city": "Orlando",
+    "service_regions": ["North", "Central"],
+    "contract_date": "March 1, 2025",
+    "provider_details": {
+        "fleet_size": 10,
+        "operating_hours": "24/7",
+        "driver_count": 20,
+        "term": "3 years",
+    },
+}
+
+
+class DictCache(dict):
+    def set(self, key, value):
+        self[key] = value
+
+
+class LayoutTableTest(unittest.TestCase):
+    def test_preamble_row_narrower_than_table(self):
+        data = "Here is the rate schedule:\n| Service | Rate | Unit |\n| Standard | $25 | trip |"
+        rows, col_widths, row_heights = contracts._layout_table(data, 468)
+        self.assertEqual(len(col_widths), 3)
+        self.assertEqual(len(row_heights), len(rows))
+
+    def test_ragged_rows(self):
+        data = "Service|Rate\nStandard|$25|per trip|base\nWheelchair"
+        rows, col_widths, _ = contracts._layout_table(data, 468)
+        self.assertEqual(len(col_widths), 4)
+        self.assertLessEqual(max(col_widths), 468 / 4)
+
+    def test_ragged_table_renders(self):
+        from io import BytesIO
+        from reportlab.platypus import SimpleDocTemplate, Table
+
+        rows, col_widths, row_heights = contracts._layout_table(
+            "Here is the rate schedule:\nService|Rate|Unit\nStandard|$25", 468
+        )
+        SimpleDocTemplate(BytesIO()).build(
+            [Table(rows, colWidths=col_widths, rowHeights=row_heights)]
+        )
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = DictCache()
+        self.generator = contracts.StateContractGenerator(STATE_INFO, response_cache=self.cache)
+        self.streamed = []
+
+        async def stream(instructions, details):
+            self.streamed.append(details)
+            yield "generated"
+
+        self.generator.stream_content_with_bedrock = stream
+
+    def generate(self):
+        return asyncio.run(self.generator.generate_content_with_bedrock("instructions", "details"))
+
+    def test_repeated_request_is_served_from_cache(self):
+        self.assertEqual(self.generate(), "generated")
+        self.assertEqual(self.generate(), "generated")
+        self.assertEqual(len(self.streamed), 1)
+
+    def test_request_settings_are_part_of_the_key(self):
+        self.generate()
+        with mock.patch.object(contracts, "MAX_OUTPUT_TOKENS", 8192):
+            self.generate()
+        self.assertEqual(len(self.streamed), 2)
+        self.assertEqual(len(self.cache), 2)
+
+
+def combined_reply(*names, end=True, preamble=""):
+    parts = [preamble] + [f"==={name}===\n{name.lower()} text\n" for name in names]
+    if end:
+        parts.append("===END===\n")
+    return "".join(parts)
+
+
+class CombinedSectionsTest(unittest.TestCase):
+    OWN_CALLS = {
+        contracts._CONTRACT_INSTRUCTIONS: "CONTRACT",
+        contracts._RATE_SCHEDULE_INSTRUCTIONS: "RATES",
+        contracts._SERVICE_AREAS_INSTRUCTIONS: "AREAS",
+        contracts._PERFORMANCE_STANDARDS_INSTRUCTIONS: "PERF",
+    }
+
+    def run_state(self, reply):
+        """Return (combined sections, process_state payload, sections that fell back)"""
+        generator = contracts.StateContractGenerator(STATE_INFO)
+        fallbacks = []
+
+        async def call(self, instructions, details_template):
+            if instructions == contracts._COMBINED_INSTRUCTIONS:
+                return reply
+            name = CombinedSectionsTest.OWN_CALLS[instructions]
+            fallbacks.append(name)
+            return f"own {name}"
+
+        with mock.patch.object(contracts.StateContractGenerator, "_call", call), \
+                contextlib.redirect_stdout(io.StringIO()):
+            sections = asyncio.run(generator.generate_combined_sections())
+            payload = asyncio.run(contracts.process_state(STATE_INFO))
+        return sections, payload[2:], sorted(fallbacks)
+
+    def test_complete_reply(self):
+        sections, payload, fallbacks = self.run_state(combined_reply(*contracts.COMBINED_SECTIONS))
+        self.assertEqual(sections, {
+            "CONTRACT": "contract text",
+            "RATES": "rates text",
+            "AREAS": "areas text",
+            "PERF": "perf text",
+        })
+        self.assertEqual(payload, ("contract text", "rates text", "areas text", "perf text"))
+        self.assertEqual(fallbacks, [])
+
+    def test_cut_off_reply_drops_the_last_section(self):
+        reply = combined_reply(*contracts.COMBINED_SECTIONS, end=False)
+        sections, payload, fallbacks = self.run_state(reply)
+        self.assertEqual(sections, {
+            "CONTRACT": "contract text",
+            "RATES": "rates text",
+            "AREAS": "areas text",
+        })
+        self.assertEqual(payload, ("contract text", "rates text", "areas text", "own PERF"))
+        self.assertEqual(fallbacks, ["PERF"])
+
+    def test_preamble_is_ignored(self):
+        reply = combined_reply(*contracts.COMBINED_SECTIONS, preamble="Here are the four parts:\n\n")
+        sections, _, fallbacks = self.run_state(reply)
+        self.assertEqual(sections["CONTRACT"], "contract text")
+        self.assertEqual(len(sections), 4)
+        self.assertEqual(fallbacks, [])
+
+    def test_missing_marker_falls_back_for_that_section(self):
+        sections, payload, fallbacks = self.run_state(combined_reply("CONTRACT", "RATES", "PERF"))
+        self.assertEqual(sections, {
+            "CONTRACT": "contract text",
+            "RATES": "rates text",
+            "PERF": "perf text",
+        })
+        self.assertEqual(payload, ("contract text", "rates text", "own AREAS", "perf text"))
+        self.assertEqual(fallbacks, ["AREAS"])
+
+    def test_empty_section_falls_back(self):
+        reply = "===CONTRACT===\ncontract text\n===RATES===\n\n===AREAS===\nareas text\n===PERF===\nperf text\n===END===\n"
+        sections, _, fallbacks = self.run_state(reply)
+        self.assertNotIn("RATES", sections)
+        self.assertEqual(fallbacks, ["RATES"])
+
+    def test_failed_combined_call_falls_back_for_everything(self):
+        sections, _, fallbacks = self.run_state(None)
+        self.assertEqual(sections, {})
+        self.assertEqual(fallbacks, ["AREAS", "CONTRACT", "PERF", "RATES"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import io
+import logging
+import os
+import shlex
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import contracts2
+
+
+def contract_html(text):
+    html = contracts2.ContractHTML("T").create_document(text, "", "", "")
+    return html.split('<div class="content">')[1].split("</div>")[0].strip()
+
+
+class CreateDocumentTest(unittest.TestCase):
+    def test_markdown_headings_and_paragraphs(self):
+        self.assertEqual(
+            contract_html("# Title\n\nBody line\n## Section ##\n"),
+            "<h1>Title</h1>\n<p>Body line</p>\n<h2>Section</h2>",
+        )
+
+    def test_crlf_line_endings(self):
+        self.assertEqual(
+            contract_html("# Title\r\n\r\nBody line\r\n"),
+            "<h1>Title</h1>\n<p>Body line</p>",
+        )
+
+    def test_model_html_headings_are_wrapped_like_other_lines(self):
+        self.assertEqual(contract_html("<h2>Terms</h2>"), "<p><h2>Terms</h2></p>")
+
+
+def combined_pdf(documents, outline=True, headers=True):
+    """Build a PDF from (title, page_count) documents, the way a batch render lays them out"""
+    from pypdf import PdfReader
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for index, (title, page_count) in enumerate(documents):
+        for page in range(page_count):
+            if outline and page == 0:
+                pdf.bookmarkPage(f"doc{index}")
+                pdf.addOutlineEntry(title, f"doc{index}", level=0)
+            if headers:
+                pdf.drawString(72, 800, title)
+            pdf.drawString(72, 400, f"Page {page + 1}")
+            pdf.showPage()
+    pdf.save()
+    buffer.seek(0)
+    return PdfReader(buffer)
+
+
+class FindDocumentStartsTest(unittest.TestCase):
+    TITLES = ["Contract - Florida", "Contract - Texas", "Contract - Ohio"]
+
+    def test_outline(self):
+        reader = combined_pdf(zip(self.TITLES, [2, 3, 1]), headers=False)
+        self.assertEqual(contracts2.find_document_starts(reader, self.TITLES), [0, 2, 5])
+
+    def test_page_headers_without_outline(self):
+        reader = combined_pdf(zip(self.TITLES, [2, 3, 1]), outline=False)
+        self.assertEqual(contracts2.find_document_starts(reader, self.TITLES), [0, 2, 5])
+
+    def test_missing_title(self):
+        reader = combined_pdf(zip(self.TITLES[:2], [2, 3]))
+        self.assertIsNone(contracts2.find_document_starts(reader, self.TITLES))
+
+    def test_titles_out_of_order(self):
+        reader = combined_pdf(zip(reversed(self.TITLES), [2, 3, 1]))
+        self.assertIsNone(contracts2.find_document_starts(reader, self.TITLES))
+
+    def test_titles_out_of_order_without_outline(self):
+        reader = combined_pdf(zip(reversed(self.TITLES), [2, 3, 1]), outline=False)
+        self.assertIsNone(contracts2.find_document_starts(reader, self.TITLES))
+
+
+class WkhtmltopdfArgLineTest(unittest.TestCase):
+    def test_flags_values_inputs_and_output(self):
+        line = contracts2.wkhtmltopdf_arg_line(
+            {'page-size': 'Letter', 'outline': '', 'quiet': ''}, ['a.html', 'b.html'], 'out.pdf'
+        )
+        self.assertEqual(line, '"--page-size" "Letter" "--outline" "a.html" "b.html" "out.pdf"')
+
+    def test_quiet_is_dropped(self):
+        line = contracts2.wkhtmltopdf_arg_line({'quiet': ''}, ['a.html'], 'out.pdf')
+        self.assertNotIn('quiet', line)
+
+    def test_backslashes_and_quotes_are_escaped(self):
+        options = {'footer-left': 'Say "hi"', 'header-left': '[title]'}
+        inputs = [r'C:\Temp\0.html']
+        line = contracts2.wkhtmltopdf_arg_line(options, inputs, r'C:\Temp\out.pdf')
+        self.assertIn(r'"Say \"hi\""', line)
+        self.assertIn(r'"C:\\Temp\\0.html"', line)
+        self.assertEqual(
+            shlex.split(line),
+            ['--footer-left', 'Say "hi"', '--header-left', '[title]', r'C:\Temp\0.html', r'C:\Temp\out.pdf'],
+        )
+
+    def test_values_with_spaces_stay_one_argument(self):
+        line = contracts2.wkhtmltopdf_arg_line(
+            {'footer-right': '[sitepage] of [sitepages]'}, [], 'out.pdf'
+        )
+        self.assertEqual(shlex.split(line), ['--footer-right', '[sitepage] of [sitepages]', 'out.pdf'])
+
+
+class LoggingToConsoleTest(unittest.TestCase):
+    def test_unknown_log_level_falls_back_to_info(self):
+        root = logging.getLogger()
+        previous_level = root.level
+        with mock.patch.object(root, "handlers", []), \
+                mock.patch.object(contracts2, "LOG_LEVEL", "BOGUS"), \
+                mock.patch("sys.stderr", new_callable=io.StringIO) as stderr:
+            with contracts2.logging_to_console():
+                self.assertEqual(root.level, logging.INFO)
+                contracts2.logger.info("progress")
+            self.assertEqual(root.handlers, [])
+        self.assertEqual(root.level, previous_level)
+        self.assertIn("Unknown LOG_LEVEL 'BOGUS', using INFO", stderr.getvalue())
+        self.assertIn("progress", stderr.getvalue())
+
+    def test_known_log_level(self):
+        root = logging.getLogger()
+        with mock.patch.object(root, "handlers", []), \
+                mock.patch.object(contracts2, "LOG_LEVEL", "WARNING"), \
+                mock.patch("sys.stderr", new_callable=io.StringIO) as stderr:
+            with contracts2.logging_to_console():
+                self.assertEqual(root.level, logging.WARNING)
+                contracts2.logger.info("progress")
+        self.assertNotIn("progress", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()